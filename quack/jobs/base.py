@@ -4,6 +4,7 @@ Base classes for jobs and processors.
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Dict, Any, Optional, TypeVar
 
 from .enums import JobType, JobStatus
@@ -90,6 +91,14 @@ class JobProcessor(ABC):
         """
         pass
 
+    async def close(self) -> None:
+        """
+        Release any long-lived resources held by the processor.
+
+        Called once when the server shuts down. The default does nothing.
+        """
+        pass
+
 
 # Concrete job implementations
 @dataclass
@@ -126,8 +135,16 @@ class BasedPyrightJob(Job):
     
     severity: str = "all"
     top_n: Optional[int] = None
-
-    def __init__(self, job_id: str, code: str, severity: str = "all", top_n: Optional[int] = None):
+    no_cache: bool = False
+
+    def __init__(
+        self,
+        job_id: str,
+        code: str,
+        severity: str = "all",
+        top_n: Optional[int] = None,
+        no_cache: bool = False,
+    ):
         super().__init__(
             id=job_id,
             status=JobStatus.PENDING,
@@ -137,3 +154,10 @@ class BasedPyrightJob(Job):
         )
         self.severity = severity
         self.top_n = top_n
+        # Always run basedpyright, bypassing cached results
+        self.no_cache = no_cache
+
+    @cached_property
+    def code_bytes(self) -> bytes:
+        """UTF-8 encoded code, shared by the temp file write and the cache key"""
+        return self.code.encode("utf-8")
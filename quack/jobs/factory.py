@@ -2,8 +2,8 @@
 Factory for creating jobs and processors.
 """
 
-import uuid
-from typing import Dict, Optional
+import secrets
+from typing import Callable, Dict, Optional
 
 from .enums import JobType
 from .base import Job, JobProcessor, LintJob, StaticAnalysisJob, BasedPyrightJob
@@ -15,6 +15,17 @@ class JobFactory:
     # Registry of job processors by job type
     processors: Dict[JobType, JobProcessor] = {}
 
+    # Job constructors by job type, called as (job_id, code, severity, top_n)
+    _CTORS: Dict[JobType, Callable[[str, str, str, Optional[int]], Job]] = {
+        JobType.LINT: lambda job_id, code, severity, top_n: LintJob(job_id, code),
+        JobType.STATIC_ANALYSIS: lambda job_id, code, severity, top_n: StaticAnalysisJob(
+            job_id, code
+        ),
+        JobType.BASEDPYRIGHT: lambda job_id, code, severity, top_n: BasedPyrightJob(
+            job_id, code, severity, top_n
+        ),
+    }
+
     @classmethod
     def register_processor(cls, job_type: JobType, processor: JobProcessor) -> None:
         """
@@ -43,17 +54,12 @@ class JobFactory:
         Raises:
             ValueError: If the job type is unknown
         """
-        job_id = uuid.uuid4().hex
-
-        if job_type == JobType.LINT:
-            return LintJob(job_id, code)
-        elif job_type == JobType.STATIC_ANALYSIS:
-            return StaticAnalysisJob(job_id, code)
-        elif job_type == JobType.BASEDPYRIGHT:
-            return BasedPyrightJob(job_id, code, severity, top_n)
-        else:
+        ctor = cls._CTORS.get(job_type)
+        if ctor is None:
             raise ValueError(f"Unknown job type: {job_type}")
 
+        return ctor(secrets.token_hex(16), code, severity, top_n)
+
     @classmethod
     def get_processor(cls, job_type: JobType) -> JobProcessor:
         """
@@ -3,74 +3,291 @@ Processor for static type analysis of Python code using basedpyright.
 """
 
 import asyncio
+import copy
+import functools
+import hashlib
 import json
 import logging
 import tempfile
 import os
+import re
+import shutil
 import subprocess
 import sys
 import time
-from typing import Dict, Any, List
+from collections import OrderedDict
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple
 
-from ..jobs.enums import JobStatus
+json_loads: Callable[[bytes], Any]
+try:
+    import orjson
+
+    # orjson parses bytes directly; orjson.JSONDecodeError subclasses json.JSONDecodeError
+    json_loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson is optional
+    json_loads = json.loads
+
+from ..jobs.enums import JobStatus, JobType
 from ..jobs.base import JobProcessor, BasedPyrightJob
+from ..utils.basedpyright_daemon import (
+    BasedPyrightDaemon,
+    BasedPyrightDaemonError,
+    BasedPyrightRequestError,
+    kill_process_group,
+)
 from ..utils.diagnostics import filter_and_output_json
 
 logger = logging.getLogger("quack")
 
+# Write job code to tmpfs when available so short-lived files never hit disk
+TEMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Project root - go up from quack/processors/ - and the basedpyright
+# configuration files it may contain, in order of precedence
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+_PYRIGHT_CONFIG = PROJECT_ROOT / "pyrightconfig.json"
+_PYPROJECT = PROJECT_ROOT / "pyproject.toml"
+
+# Output that cannot start a JSON object or array is not parsed at all
+_JSON_START = re.compile(rb"\s*[{\[]")
+
+# Exit code of a process killed by SIGKILL, as done on timeout
+_KILLED = -9
+
+# Shared read-only default for missing diagnostic fields, so the issue loop
+# does not allocate fresh empty dicts for every diagnostic
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+@functools.lru_cache(maxsize=1)
+def basedpyright_executable() -> str:
+    """Resolve the basedpyright executable once so each job skips the PATH lookup."""
+    return shutil.which("basedpyright") or "basedpyright"
+
+
+def _install_marker() -> Path:
+    """
+    Path of the marker recording that basedpyright is installed
+
+    The marker lives in the user cache directory and is keyed by the Python
+    environment, so restarts of the same environment skip the install probe.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    env_id = hashlib.blake2b(sys.prefix.encode("utf-8"), digest_size=8).hexdigest()
+    return Path(cache_home) / "quack" / f"basedpyright-{env_id}.installed"
+
 
+def _forget_install() -> None:
+    """
+    Drop the install marker and cached probes after basedpyright went missing
+
+    The next job then probes again and reinstalls basedpyright if needed.
+    """
+    try:
+        _install_marker().unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.debug("Could not remove basedpyright install marker: %s", e)
+    basedpyright_executable.cache_clear()
+    is_basedpyright_installed.cache_clear()
+
+
+def _write_install_marker() -> None:
+    """Record that basedpyright is installed, ignoring unwritable cache dirs."""
+    marker = _install_marker()
+    try:
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.touch()
+    except OSError as e:
+        logger.debug("Could not write basedpyright install marker %s: %s", marker, e)
+
+
+@functools.lru_cache(maxsize=1)
 def is_basedpyright_installed():
-    """Check if basedpyright is installed and available."""
+    """Check if basedpyright is installed and available.
+
+    A persistent install marker short-circuits the ``--version`` probe as
+    long as the executable still resolves, and the result is cached for the
+    lifetime of the process; call ``is_basedpyright_installed.cache_clear()``
+    after installing.
+    """
+    if _install_marker().is_file() and shutil.which(basedpyright_executable()):
+        return True
+
     try:
         subprocess.run(
-            ["basedpyright", "--version"],
+            [basedpyright_executable(), "--version"],
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
             check=True,
         )
-        return True
     except (subprocess.CalledProcessError, FileNotFoundError):
         return False
 
+    _write_install_marker()
+    return True
+
 
 def install_basedpyright():
-    """Install basedpyright using pip."""
+    """Install basedpyright using uv if available, otherwise pip."""
+    if shutil.which("uv"):
+        command = ["uv", "pip", "install", "--python", sys.executable, "basedpyright"]
+    else:
+        command = [sys.executable, "-m", "pip", "install", "basedpyright"]
+
     try:
-        subprocess.run(
-            [sys.executable, "-m", "pip", "install", "basedpyright"], check=True
-        )
+        subprocess.run(command, check=True)
+        _write_install_marker()
     except subprocess.CalledProcessError as e:
-        logger.error(f"Failed to install basedpyright: {e}")
+        logger.error("Failed to install basedpyright: %s", e)
         raise
+    finally:
+        # Re-probe on the next job now that the installed state may have changed
+        basedpyright_executable.cache_clear()
+        is_basedpyright_installed.cache_clear()
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_config_path() -> Optional[str]:
+    """
+    Find the configuration file basedpyright will pick up, if any
+
+    The project layout does not change while the server is running, so the
+    result is computed once per process.
+
+    Returns:
+        Path to pyrightconfig.json or pyproject.toml, or None if neither exists
+    """
+    for config in (_PYRIGHT_CONFIG, _PYPROJECT):
+        if config.is_file():
+            return str(config)
+    return None
+
+
+def _as_output(json_data: Any) -> Optional[Dict[str, Any]]:
+    """
+    Check the shape of parsed basedpyright output once
+
+    ``--outputjson`` writes an object holding ``generalDiagnostics``; a bare
+    list of diagnostics is accepted as well. Individual diagnostics are then
+    trusted to be objects, so the issue loop needs no per-item type checks.
+
+    Returns:
+        The output as a report dictionary, or None if it has another shape
+    """
+    if isinstance(json_data, dict):
+        return json_data
+    if isinstance(json_data, list):
+        return {"generalDiagnostics": json_data}
+    return None
+
+
+def _parse_output(stdout: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Parse basedpyright stdout into a report
+
+    Plain-text output is rejected by a prefix check, without paying for a
+    failed parse and the exception it raises.
+
+    Returns:
+        The report dictionary, or None if stdout is not a basedpyright report
+    """
+    if not _JSON_START.match(stdout):
+        return None
+    try:
+        return _as_output(json_loads(stdout))
+    except json.JSONDecodeError as e:
+        logger.debug("Invalid JSON output: %s", e)
+        return None
+
+
+def _reshape(diagnostics: List[Dict[str, Any]], code_lines: List[str]) -> List[Dict[str, Any]]:
+    """
+    Convert basedpyright diagnostics to issues with their line content
+
+    Args:
+        diagnostics: Diagnostics in ``--outputjson`` format
+        code_lines: Lines of the analyzed code
+
+    Returns:
+        List of issue dictionaries
+    """
+    issues: List[Dict[str, Any]] = []
+    append = issues.append
+    # Severities and rule names repeat across issues; interning them lets
+    # every issue (and every cached copy) share one string per value
+    intern = sys.intern
+    line_count = len(code_lines)
+    for diagnostic in diagnostics:
+        get = diagnostic.get
+        start_pos = get("range", _EMPTY).get("start", _EMPTY)
+        line_num = start_pos.get("line", 0) + 1  # Convert 0-based to 1-based
+        rule = get("code", get("rule"))
+        append({
+            "line": line_num,
+            "column": start_pos.get("character", 0) + 1,
+            "message": get("message", ""),
+            "severity": intern(get("severity", "error")),
+            "rule": intern(rule) if isinstance(rule, str) else rule,
+            "line_content": code_lines[line_num - 1] if 0 < line_num <= line_count else None,
+        })
+    return issues
 
 
 def log_config_detection(verbose=False):
     """Log configuration file detection for basedpyright in verbose mode."""
     if not verbose:
         return
-        
-    # Get project root - go up from quack/processors/ to project root
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    
-    # Determine which config file takes precedence
-    pyright_config = os.path.join(project_root, "pyrightconfig.json")
-    pyproject_toml = os.path.join(project_root, "pyproject.toml")
-
-    config_used = None
-    if os.path.isfile(pyright_config):
-        config_used = pyright_config
-    elif os.path.isfile(pyproject_toml):
-        config_used = pyproject_toml
-    else:
-        logger.debug("No configuration file found. Using default settings.")
 
+    config_used = _resolve_config_path()
     if config_used:
-        logger.debug(f"Using configuration from: {config_used}")
+        logger.debug("Using configuration from: %s", config_used)
+    else:
+        logger.debug("No configuration file found. Using default settings.")
 
 
 class BasedPyrightJobProcessor(JobProcessor):
     """Processor for static analysis jobs using basedpyright"""
 
+    # Delays before each retry of a failed fork; its length caps the retries
+    _BACKOFF: Tuple[float, ...] = (0.05, 0.2, 1.0)
+
+    def __init__(
+        self,
+        use_daemon: bool = False,
+        result_cache_size: int = 256,
+        daemon_restart_delay: float = 30.0,
+        cache_dir: Optional[str] = None,
+    ):
+        """
+        Initialize a new basedpyright processor
+
+        Args:
+            use_daemon: Analyze code through a long-lived basedpyright language
+                server instead of spawning the CLI for every job. The CLI is
+                still used as a fallback if the language server is unavailable.
+            result_cache_size: Number of results to remember for repeated
+                snippets (0 disables the cache)
+            daemon_restart_delay: Seconds to use the CLI after the language
+                server fails before trying to restart it
+            cache_dir: Directory that also keeps cached results across
+                restarts. Entries are keyed only by code and filter options,
+                so clear it when basedpyright or its configuration changes.
+        """
+        self.use_daemon = use_daemon
+        self._daemon: Optional[BasedPyrightDaemon] = None
+        self._daemon_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.daemon_restart_delay = daemon_restart_delay
+        self._daemon_retry_at = 0.0
+        self.result_cache_size = result_cache_size
+        self._results: "OrderedDict[Tuple[bytes, str, Optional[int]], Dict[str, Any]]" = OrderedDict()
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
     async def process(self, job: BasedPyrightJob) -> None:
         """
         Process a static analysis job using basedpyright
@@ -81,6 +298,13 @@ class BasedPyrightJobProcessor(JobProcessor):
         3. Parses the JSON output into structured data
         4. Updates the job with results or error information
 
+        When the language server daemon is enabled, steps 1-3 are replaced
+        by a single round trip to the already running server.
+
+        Empty code is completed without running basedpyright, and results
+        for code already analyzed with the same filter options are reused
+        unless the job sets ``no_cache``.
+
         The job status will be updated to COMPLETED or FAILED
         based on the outcome of the processing.
 
@@ -88,206 +312,617 @@ class BasedPyrightJobProcessor(JobProcessor):
             job: The basedpyright analysis job to process
         """
         # Mark job as running
-        job.status = JobStatus.RUNNING
-        job.started_at = time.time()
-        logger.info(f"[{job.job_type.value}:{job.id}] Starting basedpyright analysis")
+        self._start(job)
+
+        # Empty snippets have nothing to check and repeated ones were already checked
+        if not job.code.strip():
+            self._complete(job, self._build_result(job, {}), cache=False)
+            return
+        cached = None if job.no_cache else self._cached_result(self._cache_key(job))
+        if cached is not None:
+            logger.debug("[%s:%s] Using cached result", job.job_type.value, job.id)
+            # Each job gets its own copy so callers cannot alter the cached entry
+            self._complete(job, copy.deepcopy(cached), cache=False)
+            return
+
+        await self._analyze(job)
+
+    async def _analyze(self, job: BasedPyrightJob) -> None:
+        """
+        Run basedpyright for a job that was not served from the cache
 
+        Args:
+            job: The basedpyright analysis job to process
+        """
         # Ensure basedpyright is installed
-        if not is_basedpyright_installed():
-            logger.info(f"[{job.job_type.value}:{job.id}] basedpyright not found. Installing...")
-            try:
-                install_basedpyright()
-            except Exception as e:
-                logger.error(f"[{job.job_type.value}:{job.id}] Failed to install basedpyright: {e}")
-                job.status = JobStatus.FAILED
-                job.error = f"Failed to install basedpyright: {e}"
-                job.completed_at = time.time()
-                return
+        if not self._ensure_installed(job):
+            return
 
         # Log configuration detection in verbose mode
         verbose_mode = logger.isEnabledFor(logging.DEBUG)
         log_config_detection(verbose_mode)
 
-        temp_path = None
+        if self.use_daemon and time.monotonic() >= self._daemon_retry_at:
+            try:
+                await self._analyze_with_daemon(job)
+                return
+            except BasedPyrightRequestError as e:
+                # The server is healthy but rejected this one request, so
+                # only this job falls back to the CLI
+                logger.warning(
+                    "[%s:%s] Language server rejected the request, using CLI: %s",
+                    job.job_type.value, job.id, e,
+                )
+            except BasedPyrightDaemonError as e:
+                # Give a crashed server some time before it is restarted, so a
+                # broken install does not respawn it for every job
+                self._daemon_retry_at = time.monotonic() + self.daemon_restart_delay
+                logger.warning(
+                    "[%s:%s] Language server unavailable, falling back to CLI: %s",
+                    job.job_type.value, job.id, e,
+                )
+
+        await self._analyze_with_cli(job)
+
+    async def close(self) -> None:
+        """Shut down the language server daemon if one was started."""
+        daemon, self._daemon = self._daemon, None
+        if daemon is not None:
+            await daemon.close()
+
+    async def _analyze_with_daemon(self, job: BasedPyrightJob) -> None:
+        """
+        Analyze a job through the long-lived language server
+
+        Args:
+            job: The basedpyright analysis job to process
+
+        Raises:
+            BasedPyrightRequestError: If the language server rejects the request
+            BasedPyrightDaemonError: If the language server is unavailable
+        """
+        # The daemon's pipes belong to the loop that started it
+        loop = asyncio.get_running_loop()
+        if self._daemon is None or self._daemon_loop is not loop:
+            if self._daemon is not None:
+                # The old loop is gone, so the old server cannot be shut down
+                # politely; kill it rather than leak it
+                self._daemon.kill()
+            self._daemon = BasedPyrightDaemon()
+            self._daemon_loop = loop
+
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(suffix=".py", delete=False) as temp_file:
-                temp_path = temp_file.name
-                temp_file.write(job.code.encode("utf-8"))
-                logger.debug(
-                    f"[{job.job_type.value}:{job.id}] Created temporary file at {temp_path}"
+            diagnostics = await self._daemon.analyze(f"{job.id}.py", job.code, timeout=30.0)
+        except asyncio.TimeoutError:
+            logger.error("[%s:%s] Language server timed out", job.job_type.value, job.id)
+            self._fail(job, "Process timed out after 30 seconds")
+            # A slow analysis is fine, a hung server is not: restart it on the
+            # next job if it no longer answers at all
+            if not await self._daemon.ping():
+                logger.warning(
+                    "[%s:%s] Language server is unresponsive, restarting it",
+                    job.job_type.value, job.id,
                 )
+                await self._daemon.close()
+            return
+
+        self._complete(job, self._build_result(job, {"generalDiagnostics": diagnostics}))
+
+    async def _analyze_with_cli(self, job: BasedPyrightJob) -> None:
+        """
+        Analyze a job by running the basedpyright CLI on a temporary file
+
+        Args:
+            job: The basedpyright analysis job to process
+        """
+        tag = f"[{job.job_type.value}:{job.id}]"
+        temp_path = None
+        try:
+            # Create temporary file (on tmpfs when available). The CLI cannot
+            # take source over stdin: its "-" argument reads file *names*.
+            fd, temp_path = tempfile.mkstemp(suffix=".py", dir=TEMP_DIR)
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(job.code_bytes)
+            logger.debug("%s Created temporary file at %s", tag, temp_path)
 
             # Run basedpyright
             try:
-                # Try up to 3 times with exponential backoff
-                for attempt in range(3):
-                    try:
-                        if attempt > 0:
-                            logger.info(
-                                f"[{job.job_type.value}:{job.id}] Retry attempt {attempt + 1}"
-                            )
-                            # Wait with exponential backoff
-                            await asyncio.sleep(2**attempt)
-
-                        # Run basedpyright with JSON output
-                        process = await asyncio.create_subprocess_exec(
-                            "basedpyright",
-                            "--outputjson",
-                            temp_path,
-                            stdout=asyncio.subprocess.PIPE,
-                            stderr=asyncio.subprocess.PIPE,
-                        )
-
-                        logger.debug(
-                            f"[{job.job_type.value}:{job.id}] BasedPyright process started with PID: {process.pid}"
-                        )
-
-                        # Set a timeout for the process
-                        stdout, stderr = await asyncio.wait_for(
-                            process.communicate(), timeout=30.0
-                        )
-
-                        # If we get here, the process completed without timing out
-                        break
-                    except (OSError, asyncio.TimeoutError) as e:
-                        if attempt == 2:  # Last attempt
-                            raise  # Re-raise the exception
-                        logger.warning(
-                            f"[{job.job_type.value}:{job.id}] Attempt {attempt + 1} failed: {str(e)}"
-                        )
-
-                # Process results - basedpyright returns non-zero if it finds type errors
-                basedpyright_output = stdout.decode().strip()
-                basedpyright_errors = stderr.decode().strip()
-
-                if basedpyright_errors:
-                    logger.error(
-                        f"[{job.job_type.value}:{job.id}] BasedPyright error: {basedpyright_errors}"
-                    )
-                    job.status = JobStatus.FAILED
-                    job.error = f"BasedPyright error: {basedpyright_errors}"
-                    job.completed_at = time.time()
-                    return
-
-                # Parse basedpyright JSON output and apply filtering
-                if basedpyright_output:
-                    try:
-                        # BasedPyright outputs JSON format
-                        json_data = json.loads(basedpyright_output)
-                        
-                        # Use the utility function to filter and format diagnostics
-                        filtered_result = filter_and_output_json(json_data, job.severity, job.top_n)
-                        diagnostics = filtered_result.get("diagnostics", [])
-                        
-                        # Convert diagnostics to our format with line content
-                        issues: List[Dict[str, Any]] = []
-                        for diagnostic in diagnostics:
-                            if isinstance(diagnostic, dict):
-                                # Extract information from diagnostic
-                                message = diagnostic.get("message", "")
-                                severity = diagnostic.get("severity", "error")
-                                
-                                # Get position information
-                                range_info = diagnostic.get("range", {})
-                                start_pos = range_info.get("start", {})
-                                line_num = start_pos.get("line", 0) + 1  # Convert 0-based to 1-based
-                                col_num = start_pos.get("character", 0) + 1  # Convert 0-based to 1-based
-                                
-                                # Get rule/code if available
-                                rule = diagnostic.get("code", diagnostic.get("rule", None))
-                                
-                                # Add line content
-                                line_content = None
-                                if 0 <= line_num - 1 < len(job.code.splitlines()):
-                                    line_content = job.code.splitlines()[line_num - 1]
-
-                                issues.append({
-                                    "line": line_num,
-                                    "column": col_num,
-                                    "message": message,
-                                    "severity": severity,
-                                    "rule": rule,
-                                    "line_content": line_content,
-                                })
-                        
-                        # Create result with filtering metadata
-                        total_diagnostics = len(json_data.get("generalDiagnostics", []))
-                        job.result = {
-                            "status": "success",
-                            "summary": {
-                                "total_issue_count": total_diagnostics,
-                                "filtered_issue_count": len(issues),
-                                "severity_filter": job.severity,
-                                "top_n_limit": job.top_n
-                            },
-                            "issues": issues,
-                        }
-                    except json.JSONDecodeError as e:
-                        logger.warning(
-                            f"[{job.job_type.value}:{job.id}] Failed to parse JSON output: {str(e)}"
-                        )
-                        # Fall back to treating output as plain text
-                        job.result = {
-                            "status": "success",
-                            "summary": {
-                                "total_issue_count": 1,
-                                "filtered_issue_count": 1,
-                                "severity_filter": job.severity,
-                                "top_n_limit": job.top_n
-                            },
-                            "issues": [{
-                                "line": 1,
-                                "column": 1,
-                                "message": f"Raw output: {basedpyright_output}",
-                                "severity": "error",
-                                "rule": None,
-                                "line_content": None,
-                            }],
-                        }
-                else:
-                    # No output - create empty result
-                    job.result = {
-                        "status": "success",
-                        "summary": {
-                            "total_issue_count": 0,
-                            "filtered_issue_count": 0,
-                            "severity_filter": job.severity,
-                            "top_n_limit": job.top_n
-                        },
-                        "issues": [],
-                    }
-
-                issue_count = job.result.get("summary", {}).get("filtered_issue_count", 0)
-                logger.info(
-                    f"[{job.job_type.value}:{job.id}] Analysis complete with {issue_count} issues"
-                )
-                job.status = JobStatus.COMPLETED
-                job.completed_at = time.time()
+                returncode, stdout, stderr = await self._run_basedpyright(tag, temp_path)
+                self._handle_output(job, returncode, stdout, stderr)
 
             except asyncio.TimeoutError:
-                logger.error(f"[{job.job_type.value}:{job.id}] Process timed out")
-                job.status = JobStatus.FAILED
-                job.error = "Process timed out after 30 seconds"
-                job.completed_at = time.time()
+                logger.error("%s Process timed out", tag)
+                self._fail(job, "Process timed out after 30 seconds")
 
         except Exception as e:
-            logger.error(
-                f"[{job.job_type.value}:{job.id}] Error: {str(e)}", exc_info=True
-            )
-            job.status = JobStatus.FAILED
-            job.error = f"Error: {str(e)}"
-            job.completed_at = time.time()
+            logger.error("%s Error: %s", tag, e, exc_info=True)
+            self._fail(job, f"Error: {str(e)}")
 
         finally:
             # Clean up temporary file
-            if temp_path and os.path.exists(temp_path):
+            if temp_path:
                 try:
                     os.unlink(temp_path)
-                    logger.debug(
-                        f"[{job.job_type.value}:{job.id}] Cleaned up temporary file: {temp_path}"
-                    )
+                    logger.debug("%s Cleaned up temporary file: %s", tag, temp_path)
+                except FileNotFoundError:
+                    pass
                 except Exception as e:
-                    logger.error(
-                        f"[{job.job_type.value}:{job.id}] Failed to clean up temporary file: {str(e)}"
-                    )
\ No newline at end of file
+                    logger.error("%s Failed to clean up temporary file: %s", tag, e)
+
+    @staticmethod
+    def _cache_key(job: BasedPyrightJob) -> Tuple[bytes, str, Optional[int]]:
+        """Key a job's result by a digest of its code and its filter options."""
+        digest = hashlib.blake2s(job.code_bytes, digest_size=16).digest()
+        return digest, job.severity, job.top_n
+
+    def _cache_file(self, key: Tuple[bytes, str, Optional[int]]) -> Optional[Path]:
+        """Path of the persisted cache entry for a key, if persistence is enabled."""
+        if self.cache_dir is None:
+            return None
+        digest, severity, top_n = key
+        return self.cache_dir / f"{digest.hex()}-{severity}-{top_n or 'all'}.json"
+
+    def _cached_result(self, key: Tuple[bytes, str, Optional[int]]) -> Optional[Dict[str, Any]]:
+        """Look up a result in memory, then in the cache directory."""
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+            return result
+
+        path = self._cache_file(key)
+        if path is None or self.result_cache_size <= 0:
+            return None
+        try:
+            result = json_loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug("Ignoring unreadable cache entry %s: %s", path, e)
+            return None
+        self._remember(key, result)
+        return result
+
+    def _remember(self, key: Tuple[bytes, str, Optional[int]], result: Dict[str, Any]) -> None:
+        """Add a result to the in-memory LRU, evicting the least recently used entry."""
+        self._results[key] = result
+        self._results.move_to_end(key)
+        if len(self._results) > self.result_cache_size:
+            self._results.popitem(last=False)
+
+    def _store_result(self, key: Tuple[bytes, str, Optional[int]], result: Dict[str, Any]) -> None:
+        """Cache a private copy of a result and persist it if enabled."""
+        self._remember(key, copy.deepcopy(result))
+
+        path = self._cache_file(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so concurrent readers never see a partial entry
+            fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=path.parent)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.debug("Could not persist cache entry %s: %s", path, e)
+
+    def _start(self, job: BasedPyrightJob) -> None:
+        """Mark a job as running."""
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        logger.info("[%s:%s] Starting basedpyright analysis", job.job_type.value, job.id)
+
+    def _fail(self, job: BasedPyrightJob, error: str) -> None:
+        """Mark a job as failed with the given error message."""
+        job.status = JobStatus.FAILED
+        job.error = error
+        job.completed_at = time.time()
+
+    def _ensure_installed(self, job: BasedPyrightJob) -> bool:
+        """
+        Make sure basedpyright is available, installing it if needed
+
+        Args:
+            job: The job on whose behalf the check runs
+
+        Returns:
+            True if basedpyright is available, False if the job was failed
+        """
+        if is_basedpyright_installed():
+            return True
+
+        logger.info("[%s:%s] basedpyright not found. Installing...", job.job_type.value, job.id)
+        try:
+            install_basedpyright()
+        except Exception as e:
+            logger.error(
+                "[%s:%s] Failed to install basedpyright: %s", job.job_type.value, job.id, e
+            )
+            self._fail(job, f"Failed to install basedpyright: {e}")
+            return False
+        return True
+
+    async def _run_basedpyright(
+        self, tag: str, *paths: str
+    ) -> Tuple[Optional[int], bytes, bytes]:
+        """
+        Run basedpyright with JSON output on the given paths
+
+        Args:
+            tag: Log prefix identifying the job(s) being analyzed
+            paths: Files or directories to analyze
+
+        Returns:
+            Tuple of the exit code and raw (stdout, stderr) bytes
+
+        Raises:
+            OSError: If the process could not be started after all retries
+            asyncio.TimeoutError: If the process did not finish in time
+        """
+        # A failed fork is retried on the _BACKOFF schedule. A timeout is not
+        # retried at all: basedpyright is deterministic, so it would only time
+        # out again.
+        for attempt in range(len(self._BACKOFF) + 1):
+            try:
+                # Run basedpyright with JSON output
+                process = await asyncio.create_subprocess_exec(
+                    basedpyright_executable(),
+                    "--outputjson",
+                    *paths,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    start_new_session=True,
+                )
+                break
+            except FileNotFoundError:
+                # The executable is missing; retrying cannot help, but the
+                # next job should probe and reinstall instead of trusting
+                # the install marker
+                _forget_install()
+                raise
+            except OSError as e:
+                if attempt >= len(self._BACKOFF):
+                    raise
+                delay = self._BACKOFF[attempt]
+                logger.warning(
+                    "%s Failed to start basedpyright, retrying in %ss: %s", tag, delay, e
+                )
+                await asyncio.sleep(delay)
+        else:  # pragma: no cover - the last attempt breaks or raises
+            raise AssertionError("unreachable")
+
+        logger.debug("%s BasedPyright process started with PID: %s", tag, process.pid)
+
+        # A timer kills the process group on timeout, which also frees the PID
+        # and pipes right away instead of leaving node running. It avoids the
+        # extra task asyncio.wait_for would create for every run.
+        killer = asyncio.get_running_loop().call_later(30.0, kill_process_group, process)
+        try:
+            stdout, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            kill_process_group(process)
+            raise
+        finally:
+            killer.cancel()
+        if process.returncode == _KILLED:
+            raise asyncio.TimeoutError
+
+        return process.returncode, stdout, stderr
+
+    def _handle_output(
+        self, job: BasedPyrightJob, returncode: Optional[int], stdout: bytes, stderr: bytes
+    ) -> None:
+        """
+        Turn raw basedpyright output into the job's result or error
+
+        Args:
+            job: The job being processed
+            returncode: Exit code of the basedpyright process
+            stdout: Raw stdout from basedpyright
+            stderr: Raw stderr from basedpyright
+        """
+        # basedpyright exits with 1 when it finds type errors and may print
+        # progress to stderr on success, so stderr only matters for a run
+        # that failed outright without producing any output
+        if returncode not in (0, 1) and (not stdout or stdout.isspace()):
+            basedpyright_errors = (
+                stderr.decode(errors="replace").strip() or f"exit code {returncode}"
+            )
+            logger.error(
+                "[%s:%s] BasedPyright error: %s", job.job_type.value, job.id, basedpyright_errors
+            )
+            self._fail(job, f"BasedPyright error: {basedpyright_errors}")
+            return
+
+        # Both JSON parsers skip surrounding whitespace themselves, so the
+        # output is only checked for content rather than stripped into a copy
+        if not stdout or stdout.isspace():
+            # No output - create empty result
+            self._complete(job, self._build_result(job, {}))
+            return
+
+        # Parse basedpyright JSON output and apply filtering
+        json_data = _parse_output(stdout)
+        if json_data is None:
+            logger.warning(
+                "[%s:%s] Output is not a basedpyright JSON report", job.job_type.value, job.id
+            )
+            # Fall back to treating output as plain text. A garbled run says
+            # nothing about the code, so it is not cached.
+            self._complete(job, self._raw_output_result(job, stdout), cache=False)
+            return
+
+        self._complete(job, self._build_result(job, json_data))
+
+    def _raw_output_result(self, job: BasedPyrightJob, stdout: bytes) -> Dict[str, Any]:
+        """
+        Wrap output that could not be parsed as a single issue
+
+        Args:
+            job: The job being processed
+            stdout: Raw stdout from basedpyright
+
+        Returns:
+            Result dictionary for the job
+        """
+        return {
+            "status": "success",
+            "summary": {
+                "total_issue_count": 1,
+                "filtered_issue_count": 1,
+                "severity_filter": job.severity,
+                "top_n_limit": job.top_n
+            },
+            "issues": [{
+                "line": 1,
+                "column": 1,
+                "message": f"Raw output: {stdout.decode(errors='replace').strip()}",
+                "severity": "error",
+                "rule": None,
+                "line_content": None,
+            }],
+        }
+
+    def _build_result(self, job: BasedPyrightJob, json_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Filter parsed basedpyright diagnostics and convert them to issues
+
+        Args:
+            job: The job the diagnostics belong to
+            json_data: Parsed basedpyright JSON output
+
+        Returns:
+            Result dictionary for the job
+        """
+        # Use the utility function to filter and format diagnostics
+        filtered_result = filter_and_output_json(json_data, job.severity, job.top_n)
+        diagnostics = filtered_result.get("diagnostics", [])
+
+        # Convert diagnostics to our format with line content. Split once for
+        # all diagnostics, and not at all for clean code.
+        code_lines = job.code.splitlines() if diagnostics else []
+        issues = _reshape(diagnostics, code_lines)
+
+        # Create result with filtering metadata
+        total_diagnostics = len(json_data.get("generalDiagnostics", []))
+        return {
+            "status": "success",
+            "summary": {
+                "total_issue_count": total_diagnostics,
+                "filtered_issue_count": len(issues),
+                "severity_filter": job.severity,
+                "top_n_limit": job.top_n
+            },
+            "issues": issues,
+        }
+
+    def _complete(self, job: BasedPyrightJob, result: Dict[str, Any], cache: bool = True) -> None:
+        """
+        Store the result on a job and mark it as completed
+
+        Args:
+            job: The job that finished
+            result: Result dictionary for the job
+            cache: Whether to remember the result for later jobs with the same code
+        """
+        if cache and not job.no_cache and self.result_cache_size > 0:
+            self._store_result(self._cache_key(job), result)
+
+        job.result = result
+        issue_count = result.get("summary", {}).get("filtered_issue_count", 0)
+        logger.info(
+            "[%s:%s] Analysis complete with %d issues", job.job_type.value, job.id, issue_count
+        )
+        job.status = JobStatus.COMPLETED
+        job.completed_at = time.time()
+
+
+class BatchingBasedPyrightJobProcessor(BasedPyrightJobProcessor):
+    """
+    BasedPyright processor that coalesces concurrent jobs into one run
+
+    Jobs arriving within ``batch_window`` seconds of each other are written
+    to a shared temporary directory and analyzed by a single basedpyright
+    invocation, so the Node.js startup cost is paid once per batch instead
+    of once per job. Diagnostics are routed back to each job by file name.
+    A batch containing a single job is processed exactly like
+    ``BasedPyrightJobProcessor`` would. When the language server daemon is
+    enabled, batching only applies to jobs that fall back to the CLI.
+    """
+
+    def __init__(self, batch_window: float = 0.05, max_batch: int = 16, **kwargs: Any):
+        """
+        Initialize a new batching processor
+
+        Args:
+            batch_window: Seconds to wait for more jobs after the first one arrives
+            max_batch: Maximum number of jobs analyzed by one basedpyright run
+            **kwargs: Options passed on to ``BasedPyrightJobProcessor``
+        """
+        super().__init__(**kwargs)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        # Items are (job, future) pairs, or None once close() asks to stop
+        self._queue: Optional[asyncio.Queue] = None
+        self._collector: Optional[asyncio.Task] = None
+        # Strong references to in-flight batches; the event loop only keeps
+        # weak ones, so an unreferenced task could be collected mid-run
+        self._dispatches: Set[asyncio.Task] = set()
+
+    async def close(self) -> None:
+        """
+        Stop collecting batches and shut down the daemon
+
+        Jobs that are already queued or being analyzed are finished rather
+        than failed; each run is bounded by the basedpyright timeout. A job
+        submitted afterwards starts a new collector.
+        """
+        collector, self._collector = self._collector, None
+        queue, self._queue = self._queue, None
+        loop = asyncio.get_running_loop()
+
+        if collector is not None and queue is not None and collector.get_loop() is loop:
+            # Flush the queued jobs into a last batch, then stop collecting
+            queue.put_nowait(None)
+            await asyncio.gather(collector, return_exceptions=True)
+        dispatches = [task for task in self._dispatches if task.get_loop() is loop]
+        await asyncio.gather(*dispatches, return_exceptions=True)
+
+        await super().close()
+
+    async def _analyze_with_cli(self, job: BasedPyrightJob) -> None:
+        """
+        Queue a job for the next CLI batch and wait until it has been processed
+
+        Args:
+            job: The basedpyright analysis job to process
+        """
+        loop = asyncio.get_running_loop()
+        if (
+            self._collector is None
+            or self._collector.done()
+            or self._collector.get_loop() is not loop
+        ):
+            self._queue = asyncio.Queue()
+            self._collector = asyncio.create_task(self._collect_batches(self._queue))
+        assert self._queue is not None
+
+        future = loop.create_future()
+        self._queue.put_nowait((job, future))
+        await future
+
+    async def _collect_batches(self, queue: asyncio.Queue) -> None:
+        """Gather queued jobs into batches and dispatch each batch."""
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[BasedPyrightJob, asyncio.Future]] = []
+        stopping = False
+        try:
+            while not stopping:
+                # close() queues None to ask for the queue to be flushed
+                item = await queue.get()
+                if item is None:
+                    return
+                batch = [item]
+                deadline = loop.time() + self.batch_window
+                while len(batch) < self.max_batch:
+                    if not queue.empty():
+                        # Take siblings that are already waiting without a timer
+                        item = queue.get_nowait()
+                    else:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            break
+                        try:
+                            item = await asyncio.wait_for(queue.get(), remaining)
+                        except asyncio.TimeoutError:
+                            break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                task = asyncio.create_task(self._dispatch(batch))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+                batch = []
+        except asyncio.CancelledError:
+            self._release(batch)
+            raise
+
+    async def _dispatch(self, batch: List[Tuple[BasedPyrightJob, asyncio.Future]]) -> None:
+        """Process a batch and resolve the futures of its jobs."""
+        try:
+            if len(batch) == 1:
+                await super()._analyze_with_cli(batch[0][0])
+            else:
+                await self._process_batch([job for job, _ in batch])
+        finally:
+            self._release(batch)
+
+    def _release(self, batch: List[Tuple[BasedPyrightJob, asyncio.Future]]) -> None:
+        """Resolve the futures of a batch, failing jobs that never finished."""
+        for job, future in batch:
+            if not job.status.is_terminal():
+                self._fail(job, "Processor was shut down")
+            if not future.done():
+                future.set_result(None)
+
+    async def _process_batch(self, jobs: List[BasedPyrightJob]) -> None:
+        """
+        Analyze several jobs with a single basedpyright invocation
+
+        Args:
+            jobs: The jobs to analyze together
+        """
+        tag = f"[{JobType.BASEDPYRIGHT.value}:batch of {len(jobs)}]"
+        try:
+            with tempfile.TemporaryDirectory(dir=TEMP_DIR) as temp_dir:
+                temp_dir = os.path.realpath(temp_dir)
+                jobs_by_path: Dict[str, BasedPyrightJob] = {}
+                for job in jobs:
+                    path = os.path.join(temp_dir, f"{job.id}.py")
+                    with open(path, "wb") as f:
+                        f.write(job.code_bytes)
+                    jobs_by_path[path] = job
+                logger.debug("%s Wrote %d files to %s", tag, len(jobs), temp_dir)
+
+                try:
+                    returncode, stdout, stderr = await self._run_basedpyright(tag, temp_dir)
+                except asyncio.TimeoutError:
+                    logger.error("%s Process timed out", tag)
+                    for job in jobs:
+                        self._fail(job, "Process timed out after 30 seconds")
+                    return
+
+            if not stdout or stdout.isspace():
+                # Let the single-job path report errors and empty output per job
+                for job in jobs:
+                    self._handle_output(job, returncode, stdout, stderr)
+                return
+
+            json_data = _parse_output(stdout)
+            if json_data is None:
+                for job in jobs:
+                    self._handle_output(job, returncode, stdout, stderr)
+                return
+
+            # Demultiplex diagnostics back to the job whose file they refer to
+            diagnostics_by_path: Dict[str, List[Dict[str, Any]]] = {
+                path: [] for path in jobs_by_path
+            }
+            for diagnostic in json_data.get("generalDiagnostics", []):
+                path = os.path.realpath(diagnostic.get("file", ""))
+                if path in diagnostics_by_path:
+                    diagnostics_by_path[path].append(diagnostic)
+
+            for path, job in jobs_by_path.items():
+                result = self._build_result(
+                    job, {"generalDiagnostics": diagnostics_by_path[path]}
+                )
+                self._complete(job, result)
+
+        except Exception as e:
+            logger.error("%s Error: %s", tag, e, exc_info=True)
+            for job in jobs:
+                if not job.status.is_terminal():
+                    self._fail(job, f"Error: {str(e)}")
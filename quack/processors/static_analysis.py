@@ -172,12 +172,14 @@ class StaticAnalysisJobProcessor(JobProcessor):
 
         finally:
             # Clean up temporary file
-            if temp_path and os.path.exists(temp_path):
+            if temp_path:
                 try:
                     os.unlink(temp_path)
                     logger.debug(
                         f"[{job.job_type.value}:{job.id}] Cleaned up temporary file: {temp_path}"
                     )
+                except FileNotFoundError:
+                    pass
                 except Exception as e:
                     logger.error(
                         f"[{job.job_type.value}:{job.id}] Failed to clean up temporary file: {str(e)}"
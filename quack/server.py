@@ -2,22 +2,37 @@
 MCP server implementation for Quack.
 """
 
+import asyncio
 import logging
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from typing import Any, Dict, Optional
 
+import anyio
 from mcp.server.fastmcp import Context, FastMCP
 
 from .jobs.enums import JobStatus, JobType
 from .jobs.factory import JobFactory
 from .jobs.manager import JobManager
-from .processors.basedpyright import BasedPyrightJobProcessor
+from .processors.basedpyright import BatchingBasedPyrightJobProcessor
 from .processors.lint import LintJobProcessor
 from .processors.static_analysis import StaticAnalysisJobProcessor
 
 logger = logging.getLogger("quack")
 
+# Validation tables built once instead of on every tool call
+_SEVERITY_CHOICES = ("error", "warning", "info", "all")
+_VALID_SEVERITIES = frozenset(_SEVERITY_CHOICES)
+_JOB_TYPE_MAP = {job_type.value: job_type for job_type in JobType}
+_VALID_JOB_TYPES = ", ".join(_JOB_TYPE_MAP)
+
+# The processors are process-wide, but the lifespan is entered once per client
+# session (streamable-http runs one per session). They are only closed when
+# the last open session ends; the lock keeps a new session from starting
+# while that shutdown is still in progress.
+_open_sessions = 0
+_sessions_lock = asyncio.Lock()
+
 
 # Lifespan context manager for initializing the job manager
 @asynccontextmanager
@@ -31,15 +46,27 @@ async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
     Yields:
         Dictionary with initialized resources
     """
+    global _open_sessions
+
     # Initialize resources on startup
     job_manager = JobManager()
     logger.info("[Server] Job manager initialized")
 
+    async with _sessions_lock:
+        _open_sessions += 1
     try:
         yield {"job_manager": job_manager}
     finally:
-        # Clean up on shutdown (if needed)
-        logger.info("[Server] Shutting down")
+        # A session usually ends by being cancelled; shield the cleanup so
+        # its awaits are not cancelled along with it
+        with anyio.CancelScope(shield=True):
+            async with _sessions_lock:
+                _open_sessions -= 1
+                if _open_sessions == 0:
+                    # Clean up once no session can still be using the processors
+                    logger.info("[Server] Last session closed, shutting down processors")
+                    for processor in JobFactory.processors.values():
+                        await processor.close()
 
 
 def create_server() -> FastMCP:
@@ -58,35 +85,23 @@ def create_server() -> FastMCP:
         JobType.STATIC_ANALYSIS, StaticAnalysisJobProcessor()
     )
     JobFactory.register_processor(
-        JobType.BASEDPYRIGHT, BasedPyrightJobProcessor()
+        JobType.BASEDPYRIGHT, BatchingBasedPyrightJobProcessor(use_daemon=True)
     )
 
-    # Generic job submission tool
-    @mcp.tool()
-    async def submit_code(
-        job_type: str, code: str, ctx: Context
-    ) -> Dict[str, Any]:
+    def _do_submit(job_type: JobType, code: str, ctx: Context) -> Dict[str, Any]:
         """
-        Submit Python code for analysis
+        Submit a job of an already validated type
 
         Args:
-            job_type: Type of analysis to perform ("lint", "static_analysis", or "basedpyright")
+            job_type: Type of analysis to perform
             code: Python code content to analyze
+            ctx: Request context holding the job manager
 
         Returns:
             Dictionary with job ID for checking results later
         """
         job_manager = ctx.request_context.lifespan_context["job_manager"]
-
-        # Validate job type
-        try:
-            job_type_enum = JobType.from_string(job_type)
-        except ValueError as e:
-            logger.warning(f"[Server] Invalid job type: {job_type}")
-            return {"status": "error", "message": str(e)}
-
-        # Submit job
-        job = job_manager.submit_job(job_type_enum, code)
+        job = job_manager.submit_job(job_type, code)
 
         logger.info(
             f"[{job.job_type.value}:{job.id}] Submitted new job ({len(code)} bytes)"
@@ -96,9 +111,35 @@ def create_server() -> FastMCP:
             "status": "accepted",
             "job_id": job.id,
             "job_type": job.job_type.value,
-            "message": f"Code submitted for {job_type}. Use get_job_results to check status.",
+            "message": f"Code submitted for {job.job_type.value}. Use get_job_results to check status.",
         }
 
+    # Generic job submission tool
+    @mcp.tool()
+    async def submit_code(
+        job_type: str, code: str, ctx: Context
+    ) -> Dict[str, Any]:
+        """
+        Submit Python code for analysis
+
+        Args:
+            job_type: Type of analysis to perform ("lint", "static_analysis", or "basedpyright")
+            code: Python code content to analyze
+
+        Returns:
+            Dictionary with job ID for checking results later
+        """
+        # Validate job type
+        job_type_enum = _JOB_TYPE_MAP.get(job_type.lower())
+        if job_type_enum is None:
+            logger.warning(f"[Server] Invalid job type: {job_type}")
+            return {
+                "status": "error",
+                "message": f"Invalid job type: '{job_type}'. Valid types are: {_VALID_JOB_TYPES}",
+            }
+
+        return _do_submit(job_type_enum, code, ctx)
+
     # Convenience tools for specific types
     @mcp.tool()
     async def submit_code_for_linting(
@@ -113,8 +154,7 @@ def create_server() -> FastMCP:
         Returns:
             Dictionary with job ID for checking results later
         """
-        # Reuse generic submit_code tool with "lint" type
-        return await submit_code("lint", code, ctx)
+        return _do_submit(JobType.LINT, code, ctx)
 
     @mcp.tool()
     async def submit_code_for_static_analysis(
@@ -129,8 +169,7 @@ def create_server() -> FastMCP:
         Returns:
             Dictionary with job ID for checking results later
         """
-        # Reuse generic submit_code tool with "static_analysis" type
-        return await submit_code("static_analysis", code, ctx)
+        return _do_submit(JobType.STATIC_ANALYSIS, code, ctx)
 
     @mcp.tool()
     async def submit_code_for_basedpyright(
@@ -150,12 +189,11 @@ def create_server() -> FastMCP:
         job_manager = ctx.request_context.lifespan_context["job_manager"]
 
         # Validate severity parameter
-        valid_severities = ["error", "warning", "info", "all"]
-        if severity not in valid_severities:
+        if severity not in _VALID_SEVERITIES:
             logger.warning(f"[Server] Invalid severity: {severity}")
             return {
                 "status": "error",
-                "message": f"Invalid severity. Must be one of: {valid_severities}",
+                "message": f"Invalid severity. Must be one of: {list(_SEVERITY_CHOICES)}",
             }
 
         # Validate top_n parameter
@@ -256,9 +294,8 @@ def create_server() -> FastMCP:
         # Convert string job type to enum if provided
         job_type_enum = None
         if job_type:
-            try:
-                job_type_enum = JobType.from_string(job_type)
-            except ValueError:
+            job_type_enum = _JOB_TYPE_MAP.get(job_type.lower())
+            if job_type_enum is None:
                 return {
                     "status": "error",
                     "message": f"Invalid job type: {job_type}",
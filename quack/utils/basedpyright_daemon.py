@@ -0,0 +1,373 @@
+"""
+Long-lived basedpyright language server client.
+
+Spawning the ``basedpyright`` CLI for every job pays the Node.js startup and
+typeshed load each time. This module keeps a single
+``basedpyright-langserver --stdio`` process alive and analyzes code by
+opening virtual documents over LSP (JSON-RPC with ``Content-Length`` framing),
+requesting their diagnostics with ``textDocument/diagnostic``, and
+returning them in the same shape as ``basedpyright --outputjson``.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import shutil
+import signal
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("quack")
+
+# LSP DiagnosticSeverity -> severity names used by `basedpyright --outputjson`.
+# Hints (4) are editor-only and never reported by the CLI, so they are dropped.
+LSP_SEVERITIES = {1: "error", 2: "warning", 3: "information"}
+
+
+class BasedPyrightDaemonError(ConnectionError):
+    """Raised when the language server is unavailable or exits unexpectedly."""
+
+
+class BasedPyrightRequestError(BasedPyrightDaemonError):
+    """Raised when a running language server rejects a single request."""
+
+
+@functools.lru_cache(maxsize=1)
+def langserver_executable() -> str:
+    """Resolve the basedpyright language server executable once per process."""
+    return shutil.which("basedpyright-langserver") or "basedpyright-langserver"
+
+
+def kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """
+    Kill a basedpyright process together with the processes it spawned
+
+    The pip-installed ``basedpyright`` and ``basedpyright-langserver`` are
+    wrappers that run ``node`` as a child. Killing only the wrapper leaves
+    ``node`` holding the pipes open, so they are started in their own session
+    and the whole process group is killed.
+    """
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:  # pragma: no cover - Windows has no process groups
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class BasedPyrightDaemon:
+    """
+    Client for a persistent basedpyright language server
+
+    The server is started lazily on the first call to ``analyze``. Each
+    analysis opens a uniquely named virtual document, pulls its diagnostics,
+    and closes the document again, so concurrent analyses share one server
+    process. Pushed ``publishDiagnostics`` notifications are ignored because
+    pyright publishes empty placeholders for files it has not checked yet.
+    If the server exits, the next analysis starts a replacement.
+    """
+
+    def __init__(self, root_path: Optional[str] = None):
+        """
+        Initialize a new language server client
+
+        Args:
+            root_path: Workspace root used for configuration discovery
+                (defaults to the current working directory)
+        """
+        self.root_path = Path(root_path or os.getcwd()).resolve()
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._start_lock = asyncio.Lock()
+        self._next_id = 0
+        self._requests: Dict[int, asyncio.Future] = {}
+
+    @property
+    def alive(self) -> bool:
+        """Whether the language server process is running."""
+        return (
+            self._process is not None
+            and self._process.returncode is None
+            and self._reader is not None
+            and not self._reader.done()
+        )
+
+    async def start(self) -> None:
+        """
+        Start the language server and perform the LSP handshake if needed
+
+        Raises:
+            BasedPyrightDaemonError: If the server cannot be started
+        """
+        async with self._start_lock:
+            if self.alive:
+                return
+            if self._process is not None:
+                # The previous server crashed or stopped responding; reap it
+                # before starting a replacement
+                await self.close()
+
+            try:
+                self._process = await asyncio.create_subprocess_exec(
+                    langserver_executable(),
+                    "--stdio",
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL,
+                    start_new_session=True,
+                )
+            except OSError as e:
+                raise BasedPyrightDaemonError(
+                    f"Failed to start basedpyright language server: {e}"
+                ) from e
+
+            logger.info(
+                "[BasedPyrightDaemon] Language server started with PID: %s", self._process.pid
+            )
+            self._reader = asyncio.create_task(self._read_messages())
+
+            root_uri = self.root_path.as_uri()
+            try:
+                await asyncio.wait_for(
+                    self._request(
+                        "initialize",
+                        {
+                            "processId": os.getpid(),
+                            "rootUri": root_uri,
+                            "workspaceFolders": [
+                                {"uri": root_uri, "name": self.root_path.name}
+                            ],
+                            "capabilities": {
+                                "textDocument": {"diagnostic": {"dynamicRegistration": False}},
+                                "workspace": {"configuration": True},
+                            },
+                        },
+                    ),
+                    timeout=30.0,
+                )
+            except (asyncio.TimeoutError, BasedPyrightDaemonError) as e:
+                await self.close()
+                raise BasedPyrightDaemonError(
+                    f"basedpyright language server failed to initialize: {e}"
+                ) from e
+            self._notify("initialized", {})
+
+    async def analyze(self, name: str, code: str, timeout: float = 30.0) -> List[Dict[str, Any]]:
+        """
+        Analyze a snippet of Python code
+
+        Args:
+            name: Unique file name for the virtual document (e.g. "<job_id>.py")
+            code: Python code to analyze
+            timeout: Seconds to wait for diagnostics
+
+        Returns:
+            List of diagnostics shaped like basedpyright's ``generalDiagnostics``
+
+        Raises:
+            BasedPyrightRequestError: If the server rejects the diagnostic request
+            BasedPyrightDaemonError: If the server is unavailable or exits
+            asyncio.TimeoutError: If no diagnostics arrive in time
+        """
+        await self.start()
+
+        uri = (self.root_path / name).as_uri()
+        self._notify(
+            "textDocument/didOpen",
+            {
+                "textDocument": {
+                    "uri": uri,
+                    "languageId": "python",
+                    "version": 1,
+                    "text": code,
+                }
+            },
+        )
+        request_id = self._next_id + 1
+        try:
+            report = await asyncio.wait_for(
+                self._request("textDocument/diagnostic", {"textDocument": {"uri": uri}}),
+                timeout=timeout,
+            )
+        finally:
+            self._requests.pop(request_id, None)
+            if self.alive:
+                self._notify("textDocument/didClose", {"textDocument": {"uri": uri}})
+
+        lsp_diagnostics = (report or {}).get("items", [])
+        return [
+            self._to_cli_diagnostic(uri, diagnostic)
+            for diagnostic in lsp_diagnostics
+            if diagnostic.get("severity") in LSP_SEVERITIES
+        ]
+
+    async def ping(self, timeout: float = 5.0) -> bool:
+        """
+        Check that the language server still answers requests
+
+        Pyright answers an unknown ``$/`` request right away with a
+        MethodNotFound error, which is proof enough that it is responsive.
+
+        Args:
+            timeout: Seconds to wait for the answer
+
+        Returns:
+            True if the server answered in time
+        """
+        if not self.alive:
+            return False
+        request_id = self._next_id + 1
+        try:
+            await asyncio.wait_for(self._request("$/ping", None), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        except BasedPyrightRequestError:
+            pass
+        except BasedPyrightDaemonError:
+            return False
+        finally:
+            self._requests.pop(request_id, None)
+        return self.alive
+
+    async def close(self) -> None:
+        """Shut down the language server if it is running."""
+        process = self._process
+        reader = self._reader
+        if process is not None:
+            if process.returncode is None:
+                try:
+                    if self.alive and reader is not None:
+                        # Polite LSP shutdown: `shutdown` request followed by `exit`
+                        await asyncio.wait_for(self._request("shutdown", None), timeout=5.0)
+                        reader.cancel()
+                        self._notify("exit", None)
+                    if process.stdin is not None:
+                        process.stdin.close()
+                    await asyncio.wait_for(process.wait(), timeout=5.0)
+                except (asyncio.TimeoutError, OSError, BasedPyrightDaemonError):
+                    pass
+
+            # Reap anything left in the server's process group
+            kill_process_group(process)
+            try:
+                await asyncio.wait_for(process.wait(), timeout=5.0)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "[BasedPyrightDaemon] Language server %s did not exit", process.pid
+                )
+            logger.info("[BasedPyrightDaemon] Language server stopped")
+
+        self._reader = None
+        self._process = None
+        if reader is not None:
+            reader.cancel()
+        self._fail_pending(BasedPyrightDaemonError("basedpyright language server was closed"))
+
+    def kill(self) -> None:
+        """
+        Forcefully stop the language server without waiting for it
+
+        Unlike ``close`` this does not need the event loop that started the
+        server, so it can discard a server whose loop has already finished.
+        """
+        process, self._process = self._process, None
+        self._reader = None
+        # Pending futures belong to the old loop and can no longer be resolved
+        self._requests.clear()
+        if process is not None:
+            kill_process_group(process)
+
+    def _to_cli_diagnostic(self, uri: str, diagnostic: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert an LSP diagnostic to the ``--outputjson`` format."""
+        return {
+            "file": str(self.root_path / uri.rsplit("/", 1)[-1]),
+            "severity": LSP_SEVERITIES[diagnostic["severity"]],
+            "message": diagnostic.get("message", ""),
+            "range": diagnostic.get("range", {}),
+            "rule": diagnostic.get("code"),
+        }
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        """Write one framed JSON-RPC message to the server."""
+        if self._process is None or self._process.stdin is None:
+            raise BasedPyrightDaemonError("basedpyright language server is not running")
+        body = json.dumps(message).encode("utf-8")
+        # A single write keeps concurrent messages from interleaving
+        self._process.stdin.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+
+    def _notify(self, method: str, params: Optional[Dict[str, Any]]) -> None:
+        """Send a JSON-RPC notification."""
+        message: Dict[str, Any] = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        self._send(message)
+
+    def _request(self, method: str, params: Optional[Dict[str, Any]]) -> asyncio.Future:
+        """Send a JSON-RPC request and return a future for its result."""
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._requests[self._next_id] = future
+        message: Dict[str, Any] = {"jsonrpc": "2.0", "id": self._next_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        self._send(message)
+        return future
+
+    async def _read_messages(self) -> None:
+        """Read framed messages from the server and dispatch them."""
+        assert self._process is not None and self._process.stdout is not None
+        stdout = self._process.stdout
+        try:
+            while True:
+                content_length = None
+                while True:
+                    line = await stdout.readline()
+                    if not line:
+                        raise BasedPyrightDaemonError(
+                            "basedpyright language server exited unexpectedly"
+                        )
+                    if line == b"\r\n":
+                        break
+                    name, _, value = line.decode("ascii").partition(":")
+                    if name.strip().lower() == "content-length":
+                        content_length = int(value)
+                if content_length is None:
+                    continue
+
+                message = json.loads(await stdout.readexactly(content_length))
+                self._dispatch(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not isinstance(e, BasedPyrightDaemonError):
+                e = BasedPyrightDaemonError(f"basedpyright language server failed: {e}")
+            logger.warning("[BasedPyrightDaemon] %s", e)
+            self._fail_pending(e)
+
+    def _dispatch(self, message: Dict[str, Any]) -> None:
+        """Route a message from the server to whoever is waiting for it."""
+        method = message.get("method")
+        if method is None:
+            # Response to one of our requests
+            future = self._requests.pop(message.get("id", -1), None)
+            if future is not None and not future.done():
+                if "error" in message:
+                    future.set_exception(BasedPyrightRequestError(str(message["error"])))
+                else:
+                    future.set_result(message.get("result"))
+        elif "id" in message:
+            # Request from the server; only workspace/configuration needs a real answer
+            result = None
+            if method == "workspace/configuration":
+                result = [None for _ in message.get("params", {}).get("items", [])]
+            self._send({"jsonrpc": "2.0", "id": message["id"], "result": result})
+
+    def _fail_pending(self, error: Exception) -> None:
+        """Fail every request still waiting on the server."""
+        for future in list(self._requests.values()):
+            if not future.done():
+                future.set_exception(error)
+        self._requests.clear()
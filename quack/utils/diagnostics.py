@@ -2,36 +2,50 @@
 Diagnostic processing utilities for basedpyright analysis.
 """
 
-from typing import Dict, List, Any
+from itertools import islice
+from typing import Dict, List, Any, Optional
 
 
-def filter_and_output_json(data: Dict[str, Any], severity: str = "all", top_n: int = 10) -> Dict[str, Any]:
+def filter_and_output_json(
+    data: Dict[str, Any], severity: str = "all", top_n: Optional[int] = 10
+) -> Dict[str, Any]:
     """
     Filter diagnostics by severity and return the top N most critical errors as JSON.
 
     Args:
         data (dict): The raw output from basedpyright.
         severity (str): The severity level to filter by ("error", "warning", "info", or "all").
-        top_n (int): The number of top critical errors to include in the output.
+        top_n (int): The number of top critical errors to include in the output,
+            or None to include all of them.
 
     Returns:
         dict: A JSON object containing the filtered and sorted diagnostics.
     """
-    diagnostics = []
-    for diag_dict in data.get("generalDiagnostics", []):
-        diagnostics.append(diag_dict)
+    diagnostics = data.get("generalDiagnostics", ())
 
-    # Sort by severity: 'error' comes before 'warning'
-    severity_priority = {"error": 0, "warning": 1, "info": 2}
-    diagnostics = sorted(
-        diagnostics, key=lambda x: severity_priority.get(x.get("severity", "info"), 3)
-    )
-    
-    # Filter by severity if not "all"
     if severity != "all":
-        diagnostics = [
-            diag for diag in diagnostics if diag.get("severity") == severity
-        ]
+        # Filter first: a single severity level is already homogeneous,
+        # so the filtered diagnostics need no ordering at all. With a top_n
+        # limit the scan stops as soon as enough matches have been found.
+        matches = (diag for diag in diagnostics if diag.get("severity") == severity)
+        diagnostics = list(islice(matches, top_n)) if top_n is not None else list(matches)
+    else:
+        # Order by severity with a stable bucket partition: 'error' comes before
+        # 'warning', then 'info', then anything else. There are only a handful of
+        # severity levels, so this is a single O(N) pass with no comparisons.
+        errors: List[Dict[str, Any]] = []
+        warnings: List[Dict[str, Any]] = []
+        infos: List[Dict[str, Any]] = []
+        others: List[Dict[str, Any]] = []
+        buckets = {"error": errors, "warning": warnings, "info": infos}
+        for diag in diagnostics:
+            # A diagnostic without a severity ranks as 'info'
+            bucket = buckets.get(diag.get("severity", "info"), others)
+            bucket.append(diag)
+            # Once top_n errors are collected nothing later can make the cut
+            if bucket is errors and top_n is not None and len(errors) >= top_n:
+                break
+        diagnostics = errors + warnings + infos + others
 
     # Return the top N diagnostics as JSON
-    return {"diagnostics": diagnostics[:top_n] if top_n is not None else diagnostics}
\ No newline at end of file
+    return {"diagnostics": diagnostics[:top_n] if top_n is not None else diagnostics}
@@ -23,7 +23,18 @@ JobFactory.register_processor(JobType.STATIC_ANALYSIS, StaticAnalysisJobProcesso
 # Set asyncio mode
 pytest_plugins = ["pytest_asyncio"]
 
-# Use pytest-asyncio's built-in event_loop fixture
+# Asyncio mode and the session-wide event loop are configured in pytest.ini
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_home(tmp_path, monkeypatch):
+    """Keep the basedpyright install marker out of the real user cache."""
+    from quack.processors.basedpyright import is_basedpyright_installed
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    is_basedpyright_installed.cache_clear()
+    yield
+    is_basedpyright_installed.cache_clear()
 
 
 @pytest.fixture(scope="session")
@@ -3,13 +3,35 @@ Tests for the BasedPyright static analysis processor.
 """
 
 import asyncio
-from unittest.mock import AsyncMock, patch
+import json
+import os
+from dataclasses import dataclass
+from typing import Optional
+from unittest.mock import patch
 
 import pytest
 
 from quack.jobs.base import BasedPyrightJob
 from quack.jobs.enums import JobStatus
-from quack.processors.basedpyright import BasedPyrightJobProcessor
+from quack.processors.basedpyright import (
+    BasedPyrightJobProcessor,
+    BatchingBasedPyrightJobProcessor,
+    is_basedpyright_installed,
+)
+from quack.utils.basedpyright_daemon import BasedPyrightDaemonError, BasedPyrightRequestError
+
+
+@dataclass
+class FakeProcess:
+    """Stand-in for asyncio.subprocess.Process that just returns its output"""
+
+    stdout: bytes = b""
+    stderr: bytes = b""
+    pid: int = 12345
+    returncode: Optional[int] = 0
+
+    async def communicate(self, input=None):
+        return self.stdout, self.stderr
 
 
 @pytest.fixture
@@ -50,9 +72,7 @@ async def test_basedpyright_processor_success(
         ]
     }"""
 
-    mock_process = AsyncMock()
-    mock_process.communicate.return_value = (mock_json_output.encode(), b"")
-    mock_process.pid = 12345
+    mock_process = FakeProcess(stdout=mock_json_output.encode())
 
     with patch("asyncio.create_subprocess_exec", return_value=mock_process):
         with patch(
@@ -108,9 +128,7 @@ result = greet("World")
     # Mock empty JSON output (no issues)
     mock_json_output = '{"generalDiagnostics": []}'
 
-    mock_process = AsyncMock()
-    mock_process.communicate.return_value = (mock_json_output.encode(), b"")
-    mock_process.pid = 12345
+    mock_process = FakeProcess(stdout=mock_json_output.encode())
 
     with patch("asyncio.create_subprocess_exec", return_value=mock_process):
         with patch(
@@ -135,12 +153,7 @@ async def test_basedpyright_processor_stderr_error(
     basedpyright_processor, sample_basedpyright_job
 ):
     """Test basedpyright processor when stderr contains errors"""
-    mock_process = AsyncMock()
-    mock_process.communicate.return_value = (
-        b"",
-        b"basedpyright: command not found",
-    )
-    mock_process.pid = 12345
+    mock_process = FakeProcess(stderr=b"basedpyright: command not found", returncode=127)
 
     with patch("asyncio.create_subprocess_exec", return_value=mock_process):
         await basedpyright_processor.process(sample_basedpyright_job)
@@ -151,18 +164,34 @@ async def test_basedpyright_processor_stderr_error(
     assert sample_basedpyright_job.result is None
 
 
+@pytest.mark.asyncio
+async def test_basedpyright_processor_ignores_stderr_on_success(
+    basedpyright_processor, sample_basedpyright_job
+):
+    """Test that stderr noise does not fail a run that produced diagnostics"""
+    mock_process = FakeProcess(
+        stdout=b'{"generalDiagnostics": []}',
+        stderr=b"Loading configuration file...",
+        returncode=1,
+    )
+
+    with patch("asyncio.create_subprocess_exec", return_value=mock_process):
+        await basedpyright_processor.process(sample_basedpyright_job)
+
+    assert sample_basedpyright_job.status == JobStatus.COMPLETED
+    assert sample_basedpyright_job.error is None
+
+
 @pytest.mark.asyncio
 async def test_basedpyright_processor_timeout(
     basedpyright_processor, sample_basedpyright_job
 ):
     """Test basedpyright processor timeout handling"""
-    mock_process = AsyncMock()
-    mock_process.communicate.side_effect = asyncio.TimeoutError()
-    mock_process.pid = 12345
+    # A process killed by the timeout timer exits with -SIGKILL
+    mock_process = FakeProcess(returncode=-9)
 
     with patch("asyncio.create_subprocess_exec", return_value=mock_process):
-        with patch("asyncio.wait_for", side_effect=asyncio.TimeoutError()):
-            await basedpyright_processor.process(sample_basedpyright_job)
+        await basedpyright_processor.process(sample_basedpyright_job)
 
     # Check that the job failed due to timeout
     assert sample_basedpyright_job.status == JobStatus.FAILED
@@ -170,14 +199,46 @@ async def test_basedpyright_processor_timeout(
     assert sample_basedpyright_job.result is None
 
 
+@pytest.mark.asyncio
+async def test_basedpyright_processor_timeout_is_not_retried(
+    basedpyright_processor, sample_basedpyright_job
+):
+    """Test that a timed-out process is killed and not started again"""
+    killed = asyncio.Event()
+
+    class HungProcess(FakeProcess):
+        async def communicate(self, input=None):
+            await killed.wait()
+            return self.stdout, self.stderr
+
+    def kill(process):
+        process.returncode = -9
+        killed.set()
+
+    mock_process = HungProcess(returncode=None)
+    loop = asyncio.get_running_loop()
+    call_later = loop.call_later
+
+    # Fire the timeout timer right away instead of after 30 seconds
+    with patch("asyncio.create_subprocess_exec", return_value=mock_process) as mock_exec:
+        with patch(
+            "quack.processors.basedpyright.kill_process_group", side_effect=kill
+        ) as mock_kill:
+            with patch.object(loop, "call_later", lambda delay, *args: call_later(0, *args)):
+                await basedpyright_processor.process(sample_basedpyright_job)
+
+    assert mock_exec.call_count == 1
+    mock_kill.assert_called_once_with(mock_process)
+    assert sample_basedpyright_job.status == JobStatus.FAILED
+    assert "timed out" in sample_basedpyright_job.error
+
+
 @pytest.mark.asyncio
 async def test_basedpyright_processor_invalid_json(
     basedpyright_processor, sample_basedpyright_job
 ):
     """Test basedpyright processor with invalid JSON output"""
-    mock_process = AsyncMock()
-    mock_process.communicate.return_value = (b"invalid json output", b"")
-    mock_process.pid = 12345
+    mock_process = FakeProcess(stdout=b"invalid json output")
 
     with patch("asyncio.create_subprocess_exec", return_value=mock_process):
         await basedpyright_processor.process(sample_basedpyright_job)
@@ -193,31 +254,58 @@ async def test_basedpyright_processor_invalid_json(
     assert "Raw output" in result["issues"][0]["message"]
 
 
+@pytest.mark.asyncio
+async def test_basedpyright_processor_skips_parsing_plain_text(
+    basedpyright_processor, sample_basedpyright_job
+):
+    """Test that output which cannot be JSON is not handed to the parser"""
+    mock_process = FakeProcess(stdout=b"  invalid json output")
+
+    with patch("asyncio.create_subprocess_exec", return_value=mock_process):
+        with patch("quack.processors.basedpyright.json_loads") as mock_loads:
+            await basedpyright_processor.process(sample_basedpyright_job)
+
+    mock_loads.assert_not_called()
+    assert sample_basedpyright_job.status == JobStatus.COMPLETED
+    assert "Raw output" in sample_basedpyright_job.result["issues"][0]["message"]
+
+
+@pytest.mark.asyncio
+async def test_basedpyright_processor_unexpected_json_shape(
+    basedpyright_processor, sample_basedpyright_job
+):
+    """Test that valid JSON of the wrong shape is reported as raw output"""
+    mock_process = FakeProcess(stdout=b'"not a report"')
+
+    with patch("asyncio.create_subprocess_exec", return_value=mock_process):
+        await basedpyright_processor.process(sample_basedpyright_job)
+
+    assert sample_basedpyright_job.status == JobStatus.COMPLETED
+    assert "Raw output" in sample_basedpyright_job.result["issues"][0]["message"]
+
+
 @pytest.mark.asyncio
 async def test_basedpyright_processor_retry_logic(
     basedpyright_processor, sample_basedpyright_job
 ):
     """Test basedpyright processor retry logic on OSError"""
-    mock_process = AsyncMock()
-    mock_process.communicate.return_value = (b'{"generalDiagnostics": []}', b"")
-    mock_process.pid = 12345
-
-    # Mock OSError on first two attempts, success on third
-    side_effects = [
-        OSError("Connection failed"),
-        OSError("Connection failed"),
-        mock_process,
-    ]
+    mock_process = FakeProcess(stdout=b'{"generalDiagnostics": []}')
 
-    with patch("asyncio.create_subprocess_exec", side_effect=side_effects):
-        with patch("asyncio.sleep"):  # Speed up the test by mocking sleep
+    # Mock OSError on every retry but the last, which succeeds
+    backoff = BasedPyrightJobProcessor._BACKOFF
+    side_effects = [OSError("Connection failed")] * len(backoff) + [mock_process]
+
+    with patch("asyncio.create_subprocess_exec", side_effect=side_effects) as mock_exec:
+        with patch("asyncio.sleep") as mock_sleep:
             with patch(
                 "quack.processors.basedpyright.filter_and_output_json"
             ) as mock_filter:
                 mock_filter.return_value = {"diagnostics": []}
                 await basedpyright_processor.process(sample_basedpyright_job)
 
-    # Should succeed after retries
+    # Should succeed on the last retry, waiting out the backoff schedule
+    assert mock_exec.call_count == len(backoff) + 1
+    assert [c.args[0] for c in mock_sleep.await_args_list] == list(backoff)
     assert sample_basedpyright_job.status == JobStatus.COMPLETED
     assert sample_basedpyright_job.error is None
 
@@ -230,10 +318,423 @@ async def test_basedpyright_processor_retry_exhausted(
     with patch(
         "asyncio.create_subprocess_exec",
         side_effect=OSError("Persistent error"),
-    ):
+    ) as mock_exec:
         with patch("asyncio.sleep"):  # Speed up the test by mocking sleep
             await basedpyright_processor.process(sample_basedpyright_job)
 
-    # Should fail after all retries are exhausted
+    # Should fail once the backoff schedule is exhausted
+    assert mock_exec.call_count == len(BasedPyrightJobProcessor._BACKOFF) + 1
     assert sample_basedpyright_job.status == JobStatus.FAILED
     assert "Persistent error" in sample_basedpyright_job.error
+
+
+def test_is_basedpyright_installed_is_cached(tmp_path, monkeypatch):
+    """Test that the installation probe only spawns a subprocess once"""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    is_basedpyright_installed.cache_clear()
+    try:
+        with patch("subprocess.run") as mock_run:
+            assert is_basedpyright_installed() is True
+            assert is_basedpyright_installed() is True
+        assert mock_run.call_count == 1
+    finally:
+        is_basedpyright_installed.cache_clear()
+
+
+def test_is_basedpyright_installed_uses_install_marker(tmp_path, monkeypatch):
+    """Test that a successful probe leaves a marker that skips later probes"""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    is_basedpyright_installed.cache_clear()
+    try:
+        with patch("subprocess.run"):
+            assert is_basedpyright_installed() is True
+        assert list((tmp_path / "quack").glob("basedpyright-*.installed"))
+
+        is_basedpyright_installed.cache_clear()
+        with patch("subprocess.run") as mock_run:
+            assert is_basedpyright_installed() is True
+        mock_run.assert_not_called()
+    finally:
+        is_basedpyright_installed.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_batching_processor_shares_one_subprocess():
+    """Test that concurrent jobs are analyzed by a single basedpyright run"""
+    jobs = [
+        BasedPyrightJob("batch-job-1", "x: int = 'one'\n"),
+        BasedPyrightJob("batch-job-2", "y: int = 2\n"),
+    ]
+
+    def fake_exec(*args, **kwargs):
+        # Report one diagnostic against the first job's file in the batch directory
+        batch_dir = args[-1]
+        output = {
+            "generalDiagnostics": [
+                {
+                    "file": os.path.join(batch_dir, "batch-job-1.py"),
+                    "message": "Type \"Literal['one']\" is not assignable to declared type \"int\"",
+                    "severity": "error",
+                    "range": {
+                        "start": {"line": 0, "character": 9},
+                        "end": {"line": 0, "character": 14},
+                    },
+                    "rule": "reportAssignmentType",
+                }
+            ]
+        }
+        mock_process = FakeProcess(stdout=json.dumps(output).encode())
+        return mock_process
+
+    processor = BatchingBasedPyrightJobProcessor(batch_window=0.01)
+    with patch("asyncio.create_subprocess_exec", side_effect=fake_exec) as mock_exec:
+        await asyncio.gather(*[processor.process(job) for job in jobs])
+
+    assert mock_exec.call_count == 1
+    assert all(job.status == JobStatus.COMPLETED for job in jobs)
+
+    first, second = jobs[0].result, jobs[1].result
+    assert first["summary"]["filtered_issue_count"] == 1
+    assert first["issues"][0]["rule"] == "reportAssignmentType"
+    assert first["issues"][0]["line_content"] == "x: int = 'one'"
+    assert second["summary"]["filtered_issue_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batching_processor_respects_max_batch():
+    """Test that queued jobs beyond max_batch go into the next run"""
+    jobs = [BasedPyrightJob(f"batch-job-{i}", f"x{i} = {i}\n") for i in range(5)]
+
+    mock_process = FakeProcess(stdout=b'{"generalDiagnostics": []}')
+
+    processor = BatchingBasedPyrightJobProcessor(batch_window=0.01, max_batch=2)
+    with patch("asyncio.create_subprocess_exec", return_value=mock_process) as mock_exec:
+        await asyncio.gather(*[processor.process(job) for job in jobs])
+
+    assert mock_exec.call_count == 3
+    assert all(job.status == JobStatus.COMPLETED for job in jobs)
+
+
+@pytest.mark.asyncio
+async def test_basedpyright_processor_uses_daemon(sample_basedpyright_job):
+    """Test that the daemon path produces issues without spawning the CLI"""
+    processor = BasedPyrightJobProcessor(use_daemon=True)
+    diagnostics = [
+        {
+            "severity": "error",
+            "message": "Argument of type 'Literal[123]' cannot be assigned to parameter 'name' of type 'str'",
+            "range": {
+                "start": {"line": 4, "character": 14},
+                "end": {"line": 4, "character": 17},
+            },
+            "rule": "reportArgumentType",
+        }
+    ]
+
+    with patch(
+        "quack.processors.basedpyright.BasedPyrightDaemon.analyze",
+        return_value=diagnostics,
+    ):
+        with patch("asyncio.create_subprocess_exec") as mock_exec:
+            await processor.process(sample_basedpyright_job)
+
+    mock_exec.assert_not_called()
+    assert sample_basedpyright_job.status == JobStatus.COMPLETED
+    issue = sample_basedpyright_job.result["issues"][0]
+    assert issue["line"] == 5
+    assert issue["rule"] == "reportArgumentType"
+    assert issue["line_content"] == "result = greet(123)"
+
+
+@pytest.mark.asyncio
+async def test_basedpyright_processor_daemon_falls_back_to_cli(sample_basedpyright_job):
+    """Test that a failing daemon falls back to the one-shot CLI run"""
+    processor = BasedPyrightJobProcessor(use_daemon=True)
+
+    mock_process = FakeProcess(stdout=b'{"generalDiagnostics": []}')
+
+    with patch(
+        "quack.processors.basedpyright.BasedPyrightDaemon.analyze",
+        side_effect=BasedPyrightDaemonError("language server exited"),
+    ):
+        with patch("asyncio.create_subprocess_exec", return_value=mock_process) as mock_exec:
+            await processor.process(sample_basedpyright_job)
+
+    mock_exec.assert_called_once()
+    assert sample_basedpyright_job.status == JobStatus.COMPLETED
+    assert sample_basedpyright_job.result["summary"]["filtered_issue_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_basedpyright_processor_request_error_keeps_daemon():
+    """Test that a rejected request falls back for that job only"""
+    processor = BasedPyrightJobProcessor(use_daemon=True)
+    rejected = BasedPyrightJob("test-job-rejected", "x = 1\n")
+    accepted = BasedPyrightJob("test-job-accepted", "y = 2\n")
+
+    mock_process = FakeProcess(stdout=b'{"generalDiagnostics": []}')
+
+    with patch(
+        "quack.processors.basedpyright.BasedPyrightDaemon.analyze",
+        side_effect=[BasedPyrightRequestError("Invalid params"), []],
+    ) as mock_analyze:
+        with patch("asyncio.create_subprocess_exec", return_value=mock_process) as mock_exec:
+            await processor.process(rejected)
+            await processor.process(accepted)
+
+    # Only the rejected job ran through the CLI; the daemon was not backed off
+    mock_exec.assert_called_once()
+    assert mock_analyze.call_count == 2
+    assert processor._daemon_retry_at == 0.0
+    assert rejected.status == JobStatus.COMPLETED
+    assert accepted.status == JobStatus.COMPLETED
+
+
+@pytest.mark.asyncio
+async def test_basedpyright_processor_missing_executable_is_not_retried(
+    basedpyright_processor, sample_basedpyright_job
+):
+    """Test that a missing basedpyright executable fails without retries"""
+    with patch(
+        "asyncio.create_subprocess_exec",
+        side_effect=FileNotFoundError("basedpyright"),
+    ) as mock_exec:
+        with patch("asyncio.sleep") as mock_sleep:
+            await basedpyright_processor.process(sample_basedpyright_job)
+
+    assert mock_exec.call_count == 1
+    mock_sleep.assert_not_called()
+    assert sample_basedpyright_job.status == JobStatus.FAILED
+
+
+@pytest.mark.asyncio
+async def test_basedpyright_processor_caches_repeated_code(basedpyright_processor):
+    """Test that repeated code reuses the first result without running basedpyright"""
+    code = "x: int = 'hello'\n"
+    mock_json_output = json.dumps(
+        {
+            "generalDiagnostics": [
+                {
+                    "message": "Type is not assignable",
+                    "severity": "error",
+                    "range": {"start": {"line": 0, "character": 9}},
+                    "rule": "reportAssignmentType",
+                }
+            ]
+        }
+    )
+
+    mock_process = FakeProcess(stdout=mock_json_output.encode())
+
+    first = BasedPyrightJob("test-job-first", code)
+    second = BasedPyrightJob("test-job-second", code)
+    other_filter = BasedPyrightJob("test-job-warnings", code, severity="warning")
+    with patch("asyncio.create_subprocess_exec", return_value=mock_process) as mock_exec:
+        await basedpyright_processor.process(first)
+        await basedpyright_processor.process(second)
+        await basedpyright_processor.process(other_filter)
+
+    # Different filter options are cached separately
+    assert mock_exec.call_count == 2
+    assert second.status == JobStatus.COMPLETED
+    assert second.result == first.result
+    assert second.result is not first.result
+    assert other_filter.result["summary"]["filtered_issue_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_basedpyright_processor_skips_empty_code(basedpyright_processor):
+    """Test that whitespace-only code completes without running basedpyright"""
+    job = BasedPyrightJob("test-job-empty", "  \n\n")
+
+    with patch("asyncio.create_subprocess_exec") as mock_exec:
+        await basedpyright_processor.process(job)
+
+    mock_exec.assert_not_called()
+    assert job.status == JobStatus.COMPLETED
+    assert job.result["summary"]["total_issue_count"] == 0
+    assert job.result["issues"] == []
+
+
+@pytest.mark.asyncio
+async def test_basedpyright_processor_backs_off_failed_daemon():
+    """Test that a failed daemon is not restarted for every following job"""
+    processor = BasedPyrightJobProcessor(use_daemon=True, daemon_restart_delay=60.0)
+
+    mock_process = FakeProcess(stdout=b'{"generalDiagnostics": []}')
+
+    with patch(
+        "quack.processors.basedpyright.BasedPyrightDaemon.analyze",
+        side_effect=BasedPyrightDaemonError("language server exited"),
+    ) as mock_analyze:
+        with patch("asyncio.create_subprocess_exec", return_value=mock_process):
+            for i in range(3):
+                job = BasedPyrightJob(f"test-job-{i}", f"x = {i}\n")
+                await processor.process(job)
+                assert job.status == JobStatus.COMPLETED
+
+    assert mock_analyze.call_count == 1
+
+
+def test_basedpyright_processor_kills_daemon_from_finished_loop():
+    """Test that switching event loops replaces the daemon instead of leaking it"""
+    processor = BasedPyrightJobProcessor(use_daemon=True)
+
+    with patch(
+        "quack.processors.basedpyright.BasedPyrightDaemon.analyze", return_value=[]
+    ):
+        with patch("quack.processors.basedpyright.BasedPyrightDaemon.kill") as mock_kill:
+            asyncio.run(processor.process(BasedPyrightJob("test-job-1", "x = 1\n")))
+            first_daemon = processor._daemon
+            asyncio.run(processor.process(BasedPyrightJob("test-job-2", "x = 2\n")))
+
+    mock_kill.assert_called_once()
+    assert processor._daemon is not first_daemon
+
+
+@pytest.mark.asyncio
+async def test_missing_executable_forgets_install_marker(
+    tmp_path, monkeypatch, basedpyright_processor, sample_basedpyright_job
+):
+    """Test that a vanished executable makes the next job probe again"""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    with patch("subprocess.run"):
+        assert is_basedpyright_installed() is True
+    markers = list((tmp_path / "quack").glob("basedpyright-*.installed"))
+    assert markers
+
+    with patch(
+        "asyncio.create_subprocess_exec",
+        side_effect=FileNotFoundError("basedpyright"),
+    ):
+        await basedpyright_processor.process(sample_basedpyright_job)
+
+    assert sample_basedpyright_job.status == JobStatus.FAILED
+    assert not markers[0].exists()
+    with patch("subprocess.run", side_effect=FileNotFoundError) as mock_run:
+        assert is_basedpyright_installed() is False
+    mock_run.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_batching_processor_close_finishes_waiting_jobs():
+    """Test that closing the batching processor runs queued jobs instead of failing them"""
+    processor = BatchingBasedPyrightJobProcessor(batch_window=10.0, max_batch=16)
+    job = BasedPyrightJob("test-job-queued", "x = 1\n")
+    mock_process = FakeProcess(stdout=b'{"generalDiagnostics": []}')
+
+    with patch("quack.processors.basedpyright.is_basedpyright_installed", return_value=True):
+        with patch("asyncio.create_subprocess_exec", return_value=mock_process) as mock_exec:
+            task = asyncio.create_task(processor.process(job))
+            await asyncio.sleep(0.05)
+            collector = processor._collector
+            await asyncio.wait_for(processor.close(), timeout=5.0)
+            await asyncio.wait_for(task, timeout=5.0)
+
+    # The queued job was flushed right away rather than after the batch window
+    assert mock_exec.call_count == 1
+    assert collector.done() and not collector.cancelled()
+    assert job.status == JobStatus.COMPLETED
+    assert processor._collector is None
+
+
+@pytest.mark.asyncio
+async def test_basedpyright_processor_cache_evicts_least_recently_used():
+    """Test that a cache hit keeps an entry alive while older ones are evicted"""
+    processor = BasedPyrightJobProcessor(result_cache_size=2)
+
+    mock_process = FakeProcess(stdout=b'{"generalDiagnostics": []}')
+
+    with patch("asyncio.create_subprocess_exec", return_value=mock_process) as mock_exec:
+        for i, code in enumerate(["a = 1\n", "b = 2\n", "a = 1\n", "c = 3\n", "a = 1\n", "b = 2\n"]):
+            await processor.process(BasedPyrightJob(f"test-job-{i}", code))
+
+    # "a" stays cached because it was used again; "b" was evicted by "c"
+    assert mock_exec.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_basedpyright_processor_does_not_cache_raw_output(basedpyright_processor):
+    """Test that unparseable output is not served again for the same code"""
+    mock_process = FakeProcess(stdout=b"garbled output")
+
+    with patch("asyncio.create_subprocess_exec", return_value=mock_process) as mock_exec:
+        await basedpyright_processor.process(BasedPyrightJob("test-job-1", "x = 1\n"))
+        await basedpyright_processor.process(BasedPyrightJob("test-job-2", "x = 1\n"))
+
+    assert mock_exec.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_basedpyright_processor_restarts_hung_daemon(sample_basedpyright_job):
+    """Test that a daemon which stops answering is closed after a timeout"""
+    processor = BasedPyrightJobProcessor(use_daemon=True)
+
+    with patch(
+        "quack.processors.basedpyright.BasedPyrightDaemon.analyze",
+        side_effect=asyncio.TimeoutError,
+    ):
+        with patch(
+            "quack.processors.basedpyright.BasedPyrightDaemon.ping", return_value=False
+        ):
+            with patch("quack.processors.basedpyright.BasedPyrightDaemon.close") as mock_close:
+                await processor.process(sample_basedpyright_job)
+
+    mock_close.assert_called_once()
+    assert sample_basedpyright_job.status == JobStatus.FAILED
+    assert "timed out" in sample_basedpyright_job.error
+
+
+@pytest.mark.asyncio
+async def test_basedpyright_processor_no_cache_always_runs(basedpyright_processor):
+    """Test that no_cache jobs neither reuse nor store cached results"""
+    mock_process = FakeProcess(stdout=b'{"generalDiagnostics": []}')
+
+    first = BasedPyrightJob("test-job-first", "x = 1\n", no_cache=True)
+    second = BasedPyrightJob("test-job-second", "x = 1\n", no_cache=True)
+    with patch("asyncio.create_subprocess_exec", return_value=mock_process) as mock_exec:
+        await basedpyright_processor.process(first)
+        await basedpyright_processor.process(second)
+
+    assert mock_exec.call_count == 2
+    assert second.status == JobStatus.COMPLETED
+    assert not basedpyright_processor._results
+
+
+@pytest.mark.asyncio
+async def test_basedpyright_processor_persists_cache(tmp_path):
+    """Test that results in cache_dir are reused by a new processor"""
+    mock_process = FakeProcess(stdout=b'{"generalDiagnostics": []}')
+
+    first = BasedPyrightJob("test-job-first", "x = 1\n")
+    with patch("asyncio.create_subprocess_exec", return_value=mock_process):
+        await BasedPyrightJobProcessor(cache_dir=str(tmp_path)).process(first)
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    second = BasedPyrightJob("test-job-second", "x = 1\n")
+    with patch("asyncio.create_subprocess_exec") as mock_exec:
+        await BasedPyrightJobProcessor(cache_dir=str(tmp_path)).process(second)
+
+    mock_exec.assert_not_called()
+    assert second.status == JobStatus.COMPLETED
+    assert second.result == first.result
+
+
+@pytest.mark.asyncio
+async def test_basedpyright_processor_interns_repeated_strings(basedpyright_processor):
+    """Test that issues share one string per severity and rule"""
+    diagnostic = {
+        "message": "Type is not assignable",
+        "severity": "error",
+        "range": {"start": {"line": 0, "character": 9}},
+        "rule": "reportAssignmentType",
+    }
+    output = json.dumps({"generalDiagnostics": [diagnostic, diagnostic]}).encode()
+    job = BasedPyrightJob("test-job-intern", "x: int = 'a'\n")
+
+    with patch("asyncio.create_subprocess_exec", return_value=FakeProcess(stdout=output)):
+        await basedpyright_processor.process(job)
+
+    first, second = job.result["issues"]
+    assert first["severity"] is second["severity"]
+    assert first["rule"] is second["rule"]
@@ -5,11 +5,18 @@ This test directly imports the server module for testing.
 """
 
 import asyncio
+import json
 import pytest
 from pathlib import Path
+from unittest.mock import patch
+
+from mcp.shared.memory import create_connected_server_and_client_session
 
 # Import job type for testing
 from quack.jobs.enums import JobType
+from quack.jobs.factory import JobFactory
+from quack.processors.basedpyright import BatchingBasedPyrightJobProcessor
+from quack.server import create_server
 
 
 @pytest.mark.asyncio
@@ -86,3 +93,56 @@ async def test_job_listing(job_manager):
     # Verify we have stats
     assert "by_status" in stats, "No status stats returned"
     assert "by_type" in stats, "No type stats returned"
+
+
+@pytest.mark.asyncio
+async def test_session_end_keeps_shared_processors():
+    """Test that one client disconnecting does not shut down another's jobs."""
+    server = create_server()
+    original = JobFactory.processors[JobType.BASEDPYRIGHT]
+    # Use the CLI path, whose batches would be cancelled by a shutdown
+    processor = BatchingBasedPyrightJobProcessor()
+    JobFactory.register_processor(JobType.BASEDPYRIGHT, processor)
+    release = asyncio.Event()
+
+    class HeldProcess:
+        pid = 12345
+        returncode = 0
+
+        async def communicate(self, input=None):
+            await release.wait()
+            return b'{"generalDiagnostics": []}', b""
+
+    async def call(session, tool, arguments):
+        result = await session.call_tool(tool, arguments)
+        return json.loads(result.content[0].text)
+
+    try:
+        with patch("quack.processors.basedpyright.is_basedpyright_installed", return_value=True):
+            with patch("asyncio.create_subprocess_exec", return_value=HeldProcess()):
+                async with create_connected_server_and_client_session(server) as first:
+                    submitted = await call(
+                        first, "submit_code_for_basedpyright", {"code": "x = 1\n"}
+                    )
+                    await asyncio.sleep(0.2)
+
+                    # A second session connects and disconnects while the job runs
+                    async with create_connected_server_and_client_session(server):
+                        pass
+
+                    release.set()
+                    for _ in range(50):
+                        response = await call(
+                            first, "get_job_results", {"job_id": submitted["job_id"]}
+                        )
+                        if response["status"] in ("completed", "failed"):
+                            break
+                        await asyncio.sleep(0.1)
+                    assert processor._collector is not None
+
+                # The last session to end shuts the processors down
+                assert processor._collector is None
+    finally:
+        JobFactory.register_processor(JobType.BASEDPYRIGHT, original)
+
+    assert response["status"] == "completed", response
@@ -0,0 +1,92 @@
+"""
+Tests for the long-lived basedpyright language server client.
+"""
+
+import asyncio
+import os
+import shutil
+import signal
+
+import pytest
+
+from quack.utils.basedpyright_daemon import BasedPyrightDaemon, BasedPyrightDaemonError
+
+requires_langserver = pytest.mark.skipif(
+    shutil.which("basedpyright-langserver") is None,
+    reason="basedpyright-langserver is not installed",
+)
+
+
+@requires_langserver
+@pytest.mark.asyncio
+async def test_daemon_reports_diagnostics_for_concurrent_documents(tmp_path):
+    """Test that one server analyzes several snippets in CLI-compatible format"""
+    daemon = BasedPyrightDaemon(str(tmp_path))
+    try:
+        bad, good = await asyncio.wait_for(
+            asyncio.gather(
+                daemon.analyze("bad.py", 'x: int = "not an int"\n'),
+                daemon.analyze("good.py", "y: int = 1\n"),
+            ),
+            timeout=60.0,
+        )
+    finally:
+        await daemon.close()
+
+    assert good == []
+    assert len(bad) == 1
+    assert bad[0]["severity"] == "error"
+    assert bad[0]["rule"] == "reportAssignmentType"
+    assert bad[0]["range"]["start"] == {"line": 0, "character": 9}
+    assert not daemon.alive
+
+
+@requires_langserver
+@pytest.mark.asyncio
+async def test_daemon_ping_reports_responsiveness(tmp_path):
+    """Test that a running server answers pings and a closed one does not"""
+    daemon = BasedPyrightDaemon(str(tmp_path))
+    try:
+        await asyncio.wait_for(daemon.start(), timeout=60.0)
+        assert await daemon.ping() is True
+    finally:
+        await daemon.close()
+
+    assert await daemon.ping() is False
+
+
+@pytest.mark.asyncio
+async def test_daemon_start_failure_raises_daemon_error(monkeypatch):
+    """Test that a missing language server surfaces as BasedPyrightDaemonError"""
+
+    async def fail_exec(*args, **kwargs):
+        raise FileNotFoundError("basedpyright-langserver")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fail_exec)
+    daemon = BasedPyrightDaemon()
+
+    with pytest.raises(BasedPyrightDaemonError):
+        await daemon.analyze("job.py", "x = 1\n")
+
+
+@requires_langserver
+@pytest.mark.asyncio
+async def test_daemon_restarts_after_crash(tmp_path):
+    """Test that the next analysis replaces a language server that died"""
+    daemon = BasedPyrightDaemon(str(tmp_path))
+    try:
+        await asyncio.wait_for(daemon.analyze("first.py", "x = 1\n"), timeout=60.0)
+        crashed = daemon._process
+        # Kill the whole group: the wrapper script runs node as a child
+        os.killpg(crashed.pid, signal.SIGKILL)
+        await asyncio.wait_for(crashed.wait(), timeout=10.0)
+
+        diagnostics = await asyncio.wait_for(
+            daemon.analyze("second.py", 'x: int = "not an int"\n'), timeout=60.0
+        )
+        assert daemon._process is not crashed
+        assert daemon.alive
+    finally:
+        await daemon.close()
+
+    assert len(diagnostics) == 1
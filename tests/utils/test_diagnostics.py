@@ -0,0 +1,64 @@
+"""
+Tests for the basedpyright diagnostic filtering utilities.
+"""
+
+from quack.utils.diagnostics import filter_and_output_json
+
+
+def _diag(severity, line):
+    return {"severity": severity, "message": f"{severity} on line {line}", "range": {"start": {"line": line}}}
+
+
+SAMPLE = {
+    "generalDiagnostics": [
+        _diag("warning", 1),
+        _diag("error", 2),
+        _diag("information", 3),
+        _diag("info", 4),
+        _diag("error", 5),
+        _diag("warning", 6),
+    ]
+}
+
+
+def _lines(result):
+    return [d["range"]["start"]["line"] for d in result["diagnostics"]]
+
+
+def test_filter_orders_by_severity_and_keeps_input_order():
+    """Test that errors come first and ties keep their original order"""
+    result = filter_and_output_json(SAMPLE, "all", None)
+    assert _lines(result) == [2, 5, 1, 6, 4, 3]
+
+
+def test_filter_ranks_missing_severity_as_info():
+    """Test that a diagnostic without a severity sorts alongside 'info'"""
+    unrated = {"message": "no severity", "range": {"start": {"line": 2}}}
+    data = {"generalDiagnostics": [_diag("warning", 1), unrated, _diag("information", 3), _diag("info", 4)]}
+    assert _lines(filter_and_output_json(data, "all", None)) == [1, 2, 4, 3]
+
+
+def test_filter_by_severity():
+    """Test filtering down to a single severity level"""
+    assert _lines(filter_and_output_json(SAMPLE, "warning", None)) == [1, 6]
+    assert _lines(filter_and_output_json(SAMPLE, "information", None)) == [3]
+
+
+def test_filter_top_n():
+    """Test that top_n keeps the most severe diagnostics"""
+    assert _lines(filter_and_output_json(SAMPLE, "all", 3)) == [2, 5, 1]
+    assert _lines(filter_and_output_json(SAMPLE, "error", 1)) == [2]
+
+
+def test_filter_without_diagnostics():
+    """Test that missing or empty diagnostics produce an empty list"""
+    assert filter_and_output_json({}, "all", 10) == {"diagnostics": []}
+    assert filter_and_output_json({"generalDiagnostics": []}, "error", None) == {"diagnostics": []}
+
+
+def test_filter_top_n_stops_scanning_once_settled():
+    """Test that the scan ends once the top N diagnostics are known"""
+    # The trailing None would raise if it were ever inspected
+    data = {"generalDiagnostics": [_diag("warning", 1), _diag("error", 2), _diag("error", 3), None]}
+    assert _lines(filter_and_output_json(data, "all", 2)) == [2, 3]
+    assert _lines(filter_and_output_json(data, "error", 2)) == [2, 3]